@@ -3,12 +3,13 @@
 Shared data models for chain tracing functionality.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from dataclasses import dataclass
+from operator import attrgetter
 from log_parser import LogEntry
 
 
-@dataclass
+@dataclass(slots=True)
 class TraceInfo:
     """Aggregated information extracted from all entries with the same trace_id."""
     query_text: Optional[str] = None
@@ -18,7 +19,7 @@ class TraceInfo:
     representative_entry: Optional[LogEntry] = None  # First entry with session_id
 
 
-@dataclass
+@dataclass(slots=True)
 class LockInvalidationChain:
     """Полное описание всей информации, извлеченной из лога по одной ошибке TLI."""
     victim_session_id: str
@@ -36,12 +37,14 @@ class LockInvalidationChain:
     culprit_tx_id: Optional[str] = None
     victim_queries: Optional[List[LogEntry]] = None
     culprit_queries: Optional[List[LogEntry]] = None
-    log_details: Optional[List[str]] = None
+    log_details: Optional[Dict[str, None]] = None  # Упорядоченное множество строк лога
 
     @property
-    def is_victim_committed(self):
-        if self.victim_queries:
-            return self.victim_queries[-1].query_action == "QUERY_ACTION_COMMIT_TX"
+    def is_victim_committed(self) -> Optional[bool]:
+        # None означает, что запросы жертвы не найдены и ответ неизвестен
+        victim_queries = self.victim_queries
+        if victim_queries:
+            return victim_queries[-1].query_action == "QUERY_ACTION_COMMIT_TX"
         return None
     
     def get_victim_hash(self):
@@ -54,3 +57,7 @@ class LockInvalidationChain:
             return hash('|'.join((e.query_text for e in self.culprit_queries)))
         return ""
 
+
+# Ключ сортировки цепочек по времени жертвы. Временные метки в одном
+# формате ISO-8601, поэтому сортируются как строки
+victim_timestamp_key = attrgetter('victim_entry.timestamp')
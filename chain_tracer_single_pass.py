@@ -10,9 +10,19 @@
 from typing import List, Optional, Dict, Iterable
 from log_parser import LogEntry
 from chain_models import LockInvalidationChain
-import re
 import logging
 from collections import defaultdict
+from operator import attrgetter
+
+
+_timestamp_key = attrgetter('timestamp')
+
+# Поля, без которых цепочка считается неполной (в порядке вывода в отладочном сообщении)
+_REQUIRED_CHAIN_FIELDS = (
+    "victim_session_id", "victim_trace_id", "lock_id", "culprit_phy_tx_id",
+    "culprit_trace_id", "culprit_session_id", "victim_entry", "culprit_entry",
+    "table_name", "victim_tx_id", "culprit_tx_id", "victim_queries", "culprit_queries",
+)
 
 
 class ChainTracerSinglePass:
@@ -30,14 +40,21 @@ class ChainTracerSinglePass:
         self.chains_by_lock_id: Dict[str, LockInvalidationChain] = {}  # лок уникальный, поэтому тут 1:1
 
         # Каждая PhyTxId может сломать множество транзакций, поэтому список
-        self.chains_by_culprit_phy_tx_id: Dict[str, list[LockInvalidationChain]] = defaultdict(list)  
+        self.chains_by_culprit_phy_tx_id: Dict[str, list[LockInvalidationChain]] = {}
         
         # Из-за того что PhyTxId может сломать множество транзакций, тут тоже должен быть список
-        self.chains_by_culprit_trace_id: Dict[str, list[LockInvalidationChain]] = defaultdict(list)  
+        self.chains_by_culprit_trace_id: Dict[str, list[LockInvalidationChain]] = {}
 
         
+        # Отладочные сообщения в горячих местах форматируются только если DEBUG включен
+        self._debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+
         # Кэш для entries по trace_id (для получения culprit_entry и query_text)
         self.entries_by_trace: Dict[str, LogEntry] = {}
+
+        # Уже отсортированные запросы по транзакциям. Один виновник часто ломает
+        # много жертв, и без кэша его запросы сортировались бы для каждой цепочки
+        self._sorted_queries_by_tx: Dict[str, List[LogEntry]] = {}
     
     def find_all_invalidation_chains(self, collect_details: bool = False) -> List[LockInvalidationChain]:
         """Находит все цепочки TLI в логе за один проход.
@@ -48,24 +65,43 @@ class ChainTracerSinglePass:
             collect_details: Если True, собирает детальную информацию о всех строках лога,
                            которые относятся к каждой цепочке в поле log_details.
         """
+        # Уровень логирования мог измениться после создания трассировщика
+        self._debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+
         # Перебираем строки последовательно и строим цепочки
         for entry in self.log_entries:
             self._process_entry(entry, collect_details)
 
-        # Заполнить victim_queries и culprit_queries для найденных цепочек
-        self._populate_queries()
+        # Заполнить запросы, завершить и проверить цепочки за один проход
+        incomplete_count = 0
+        for chain in self.chains.values():
+            # Заполнить victim_queries и culprit_queries
+            self._populate_queries(chain)
+
+            # Завершить незавершенную цепочку
+            self._complete_chain(chain)
 
-        # Завершить все незавершенные цепочки
-        self._complete_remaining_chains()
-        
-        # Проверить, что все цепочки полностью заполнены
-        self._validate_chains()
+            # Проверить, что цепочка полностью заполнена
+            if not self._validate_chain(chain):
+                incomplete_count += 1
+
+        logging.info(f"Chain analysis complete: found {len(self.chains)} TLI chains, {incomplete_count} incomplete")
         
         return [v for v in self.chains.values()]
     
     
     def _process_entry(self, entry: LogEntry, collect_details: bool):
         """Обрабатывает одну запись лога и обновляет цепочки."""
+        # Метод вызывается для каждой строки лога, поэтому поля записи
+        # читаем в локальные переменные один раз
+        trace_id = entry.trace_id
+        session_id = entry.session_id
+        phy_tx_id = entry.phy_tx_id
+        tx_id = entry.tx_id
+        status = entry.status
+        # Цепочки, к которым относится строка - для log_details
+        touched: Optional[List[LockInvalidationChain]] = [] if collect_details else None
+
         # Собираем запросы для транзакций
         if entry.query_action:
             self._collect_transaction_queries(entry)
@@ -74,50 +110,65 @@ class ChainTracerSinglePass:
         self._collect_session_tx(entry)
         
         # Кэшируем entries для всех trace_id, которые могут понадобиться
-        if entry.trace_id and entry.trace_id != 'Empty':
-            if entry.trace_id not in self.entries_by_trace:
+        if trace_id and trace_id != 'Empty':
+            entries_by_trace = self.entries_by_trace
+            cached = entries_by_trace.get(trace_id)
+            if cached is None:
                 # Сохраняем первую встреченную запись
-                self.entries_by_trace[entry.trace_id] = entry
-            elif entry.session_id and not self.entries_by_trace[entry.trace_id].session_id:
+                entries_by_trace[trace_id] = entry
+            elif session_id and not cached.session_id:
                 # Заменяем на запись с session_id, если текущая его не имеет
-                self.entries_by_trace[entry.trace_id] = entry
-            elif entry.query_text and not self.entries_by_trace[entry.trace_id].query_text:
+                entries_by_trace[trace_id] = entry
+            elif entry.query_text and not cached.query_text:
                 # Заменяем на запись с query_text, если текущая его не имеет
-                self.entries_by_trace[entry.trace_id] = entry
+                entries_by_trace[trace_id] = entry
         
         # Если в строке есть Transaction locks invalidated - создаем новую цепочку
         if self._is_transaction_locks_invalidated(entry):
             self._create_new_chain(entry, collect_details)
 
-        # Если в строке есть интересующий нас TraceId (victim)  и LOCKS_BROKEN - заполняем phy_tx_id для жертвы
-        if entry.trace_id in self.chains and entry.status == "LOCKS_BROKEN" and entry.phy_tx_id:
-            self._fill_victim_phy_tx_id(entry)
-
-        # Если в строке есть интересующий нас TraceId (victim) и LOCKS_BROKEN - заполняем lock_id
-        if entry.trace_id in self.chains and entry.status == "LOCKS_BROKEN" and entry.lock_id:
-            self._fill_lock_id(entry)
+        # Если в строке есть интересующий нас TraceId (victim) и LOCKS_BROKEN -
+        # заполняем phy_tx_id и lock_id для жертвы
+        if status == "LOCKS_BROKEN":
+            chain = self.chains.get(trace_id)
+            if chain is not None and (phy_tx_id or entry.lock_id):
+                if touched is not None:
+                    touched.append(chain)
+                if phy_tx_id:
+                    self._fill_victim_phy_tx_id(chain, entry)
+                if entry.lock_id:
+                    self._fill_lock_id(chain, entry)
         
         # Если в строке есть интересующий нас break_lock_id - заполняем culprit_phy_tx_id в цепочке
         if entry.break_lock_id:
-            self._fill_culprit_phy_tx_id(entry)
+            self._fill_culprit_phy_tx_id(entry, touched)
         
         # Если в строке есть интересующий нас PhyTxId и TraceId не пустой - заполняем culprit_trace_id в цепочке
-        if entry.phy_tx_id in self.chains_by_culprit_phy_tx_id and entry.trace_id and entry.trace_id != 'Empty':
-            self._fill_culprit_trace_id(entry)
-        
-        # Если в строке есть интересующий нас TraceId и SessionId не пустой - заполняем culprit_session_id в цепочке
-        if entry.trace_id in self.chains_by_culprit_trace_id and entry.session_id:
-            self._fill_culprit_session_id(entry)
+        if trace_id and trace_id != 'Empty' and phy_tx_id in self.chains_by_culprit_phy_tx_id:
+            self._fill_culprit_trace_id(entry, touched)
         
-        # Если в строке есть интересующий нас TraceId и TxId - заполняем culprit_tx_id в цепочке
-        if entry.trace_id in self.chains_by_culprit_trace_id and entry.tx_id and entry.tx_id != 'Empty':
-            self._fill_culprit_tx_id(entry)
+        # Если в строке есть интересующий нас TraceId виновника - заполняем
+        # culprit_session_id (если есть SessionId) и culprit_tx_id (если есть TxId)
+        if trace_id in self.chains_by_culprit_trace_id:
+            if session_id:
+                self._fill_culprit_session_id(entry, touched)
+            if tx_id and tx_id != 'Empty':
+                self._fill_culprit_tx_id(entry, touched)
+
+        # Добавляем строку в log_details один раз, а не в каждом _fill_* методе
+        if touched:
+            raw_line = entry.raw_line
+            for chain in touched:
+                if chain.log_details is not None:
+                    chain.log_details[raw_line] = None
     
     def _is_transaction_locks_invalidated(self, entry: LogEntry) -> bool:
         """Проверяет, содержит ли запись сообщение о TLI."""
-        return (entry.issues and 
-                "Transaction locks invalidated" in entry.issues and
-                entry.status == "ABORTED")
+        # Сначала дешевое сравнение статуса - ABORTED встречается редко,
+        # поэтому поиск подстроки в issues для большинства строк не выполняется
+        return (entry.status == "ABORTED" and
+                bool(entry.issues) and
+                "Transaction locks invalidated" in entry.issues)
     
     def _create_new_chain(self, entry: LogEntry, collect_details: bool = False):
         """Создает новую цепочку для TLI."""
@@ -134,22 +185,14 @@ class ChainTracerSinglePass:
             victim_entry=entry,
             table_name=table_name,
             victim_tx_id=entry.tx_id if entry.tx_id != 'Unknown' else None,
-            log_details=[entry.raw_line] if collect_details else None
+            log_details={entry.raw_line: None} if collect_details else None
         )
         
         self.chains[entry.trace_id] = chain
         logging.debug(f"{chain.victim_trace_id} - Created new TLI chain for table {table_name}")
     
-    def _fill_lock_id(self, entry: LogEntry):
-        """Заполняет lock_id в цепочке."""
-        chain = self.chains.get(entry.trace_id)
-        if not chain:
-            logging.warning(f"Expected to find chain for victim TraceId {entry.trace_id}, but not found")
-            return
-        
-        if chain.log_details is not None and entry.raw_line not in chain.log_details:
-            chain.log_details.append(entry.raw_line)
-        
+    def _fill_lock_id(self, chain: LockInvalidationChain, entry: LogEntry):
+        """Заполняет lock_id в цепочке жертвы."""
         if chain.lock_id:
             logging.warning(f"{chain.victim_trace_id} - Chain for TraceId {entry.trace_id} already has LockId {chain.lock_id}, ignoring new LockId {entry.lock_id}")
             return
@@ -164,23 +207,16 @@ class ChainTracerSinglePass:
         if len(entry.lock_id) > 1:
             logging.warning(f"{chain.victim_trace_id} - There are several LockId in BreakLocks row. This case is not handled.")
 
-        first_lock_id = entry.lock_id[0] if isinstance(entry.lock_id, list) else entry.lock_id
+        # Парсер всегда возвращает LockId списком
+        first_lock_id = entry.lock_id[0]
         # Only log if we're actually setting a new value (chain.lock_id was empty)
         if not chain.lock_id:
             chain.lock_id = first_lock_id
             self.chains_by_lock_id[first_lock_id] = chain
             logging.debug(f"{chain.victim_trace_id} - Found lock_id {first_lock_id}")
 
-    def _fill_victim_phy_tx_id(self, entry: LogEntry):
-        """Заполняет victim_phy_tx_id в цепочке."""
-        chain = self.chains.get(entry.trace_id)
-        if not chain:
-            logging.warning(f"Expected to find chain for victim TraceId {entry.trace_id}, but not found")
-            return
-        
-        if chain.log_details is not None and entry.raw_line not in chain.log_details:
-            chain.log_details.append(entry.raw_line)
-        
+    def _fill_victim_phy_tx_id(self, chain: LockInvalidationChain, entry: LogEntry):
+        """Заполняет victim_phy_tx_id в цепочке жертвы."""
         if chain.victim_phy_tx_id:
             logging.warning(f"{chain.victim_trace_id} - Chain for TraceId {entry.trace_id} already has victim PhyTxId {chain.victim_phy_tx_id}, ignoring new PhyTxId {entry.phy_tx_id}")
             return
@@ -194,7 +230,8 @@ class ChainTracerSinglePass:
             chain.victim_phy_tx_id = entry.phy_tx_id
             logging.debug(f"{chain.victim_trace_id} - Found victim_phy_tx_id {entry.phy_tx_id}")
 
-    def _fill_culprit_phy_tx_id(self, entry: LogEntry):
+    def _fill_culprit_phy_tx_id(self, entry: LogEntry,
+                                touched: Optional[List[LockInvalidationChain]] = None):
         """Заполняет culprit_phy_tx_id в цепочке по break_lock_id."""
         if not entry.break_lock_id:
             return
@@ -203,19 +240,24 @@ class ChainTracerSinglePass:
             logging.warning(f"Expected PhyTxId in BreakLocks entry, but not found")
             return
 
+        # Пока ни одного LockId жертвы не найдено, перебирать сломанные блокировки бессмысленно
+        if not self.chains_by_lock_id:
+            return
+
         for lock_id in entry.break_lock_id:
             chain = self.chains_by_lock_id.get(lock_id)
             if not chain:
                 # Это нормально - не все break_lock_id относятся к нашим цепочкам
                 continue
 
-            if chain.log_details is not None and entry.raw_line not in chain.log_details:
-                chain.log_details.append(entry.raw_line)
+            if touched is not None:
+                touched.append(chain)
 
             if chain.victim_phy_tx_id and chain.victim_phy_tx_id == entry.phy_tx_id:
                 # Когда транзакция обнаруживает, что ее лок сломан, она логирует это и в BROKEN_LOCKS  и в LocksBroken
                 # Поэтому приходится игнорировать часть строк. Не логирую, т.к. это совсем не интересно
-                logging.debug(f"{chain.victim_trace_id} - skipping wrong LocksBroken entry")
+                if self._debug_enabled:
+                    logging.debug(f"{chain.victim_trace_id} - skipping wrong LocksBroken entry")
                 continue
                 
             if chain.culprit_phy_tx_id and chain.culprit_phy_tx_id != entry.phy_tx_id:
@@ -225,21 +267,18 @@ class ChainTracerSinglePass:
             # Only log if we're actually setting a new value (chain.culprit_phy_tx_id was empty)
             if not chain.culprit_phy_tx_id:
                 chain.culprit_phy_tx_id = entry.phy_tx_id
-                self.chains_by_culprit_phy_tx_id[entry.phy_tx_id].append(chain)
+                self.chains_by_culprit_phy_tx_id.setdefault(entry.phy_tx_id, []).append(chain)
                 logging.debug(f"{chain.victim_trace_id} - Found culprit_phy_tx_id {entry.phy_tx_id} for lock_id {lock_id}")
     
-    def _fill_culprit_trace_id(self, entry: LogEntry):
+    def _fill_culprit_trace_id(self, entry: LogEntry,
+                               touched: Optional[List[LockInvalidationChain]] = None):
         """Заполняет culprit_trace_id в цепочке."""
-        victim_chains = self.chains_by_culprit_phy_tx_id.get(entry.phy_tx_id)
-        
-        if not victim_chains:
-            logging.warning(f"Expected to find chains for culprit PhyTxId {entry.phy_tx_id}, but not found")
-            return
+        # Вызывается только если phy_tx_id есть в chains_by_culprit_phy_tx_id
+        victim_chains = self.chains_by_culprit_phy_tx_id[entry.phy_tx_id]
 
         for chain in victim_chains:
-            if chain.log_details is not None and entry.raw_line not in chain.log_details:
-                chain.log_details.append(entry.raw_line)
-            
+            if touched is not None:
+                touched.append(chain)
             if chain.culprit_trace_id and chain.culprit_trace_id != entry.trace_id:
                 logging.warning(f"{chain.victim_trace_id} - Chain for PhyTxId {entry.phy_tx_id} already has culprit TraceId {chain.culprit_trace_id}, ignoring new TraceId {entry.trace_id}")
                 return
@@ -252,20 +291,18 @@ class ChainTracerSinglePass:
             if not chain.culprit_trace_id:
                 chain.culprit_trace_id = entry.trace_id
                 # Добавляем culprit trace_id в целевые для дальнейшего поиска
-                self.chains_by_culprit_trace_id[entry.trace_id].append(chain)
+                self.chains_by_culprit_trace_id.setdefault(entry.trace_id, []).append(chain)
                 logging.debug(f"{chain.victim_trace_id} - Found culprit_trace_id {entry.trace_id}")
     
-    def _fill_culprit_session_id(self, entry: LogEntry):
+    def _fill_culprit_session_id(self, entry: LogEntry,
+                                 touched: Optional[List[LockInvalidationChain]] = None):
         """Заполняет culprit_session_id в цепочке."""
-        victim_chains = self.chains_by_culprit_trace_id.get(entry.trace_id)
-        if not victim_chains:
-            logging.warning(f"Expected to find chain for culprit TraceId {entry.trace_id}, but not found")
-            return
+        # Вызывается только если trace_id есть в chains_by_culprit_trace_id
+        victim_chains = self.chains_by_culprit_trace_id[entry.trace_id]
         
         for chain in victim_chains:
-            if chain.log_details is not None and entry.raw_line not in chain.log_details:
-                chain.log_details.append(entry.raw_line)
-            
+            if touched is not None:
+                touched.append(chain)
             if not entry.session_id:
                 logging.warning(f"{chain.victim_trace_id} - Expected SessionId for culprit TraceId {entry.trace_id}, but not found")
                 return
@@ -280,17 +317,15 @@ class ChainTracerSinglePass:
                 chain.culprit_session_id = entry.session_id
                 logging.debug(f"{chain.victim_trace_id} - Found culprit_session_id {entry.session_id}")
     
-    def _fill_culprit_tx_id(self, entry: LogEntry):
+    def _fill_culprit_tx_id(self, entry: LogEntry,
+                            touched: Optional[List[LockInvalidationChain]] = None):
         """Заполняет culprit_tx_id в цепочке."""
-        victim_chains = self.chains_by_culprit_trace_id.get(entry.trace_id)
-        if not victim_chains:
-            logging.warning(f"Expected to find chain for culprit TraceId {entry.trace_id}, but not found")
-            return
+        # Вызывается только если trace_id есть в chains_by_culprit_trace_id
+        victim_chains = self.chains_by_culprit_trace_id[entry.trace_id]
 
         for chain in victim_chains:
-            if chain.log_details is not None and entry.raw_line not in chain.log_details:
-                chain.log_details.append(entry.raw_line)
-            
+            if touched is not None:
+                touched.append(chain)
             if not entry.tx_id or entry.tx_id == 'Empty':
                 logging.warning(f"{chain.victim_trace_id} - Expected valid TxId, but got {entry.tx_id}")
                 return
@@ -301,12 +336,14 @@ class ChainTracerSinglePass:
             
             if chain.culprit_tx_id and chain.culprit_tx_id != entry.tx_id:
                 # Обнаружился другой TxId - это ненормально, игнорируем его
-                logging.debug(f"{chain.victim_trace_id} - Chain already has culprit_tx_id {chain.culprit_tx_id}, ignoring different tx_id {entry.tx_id}")
+                if self._debug_enabled:
+                    logging.debug(f"{chain.victim_trace_id} - Chain already has culprit_tx_id {chain.culprit_tx_id}, ignoring different tx_id {entry.tx_id}")
                 return
                     
             # В поле TxId в некоторых случаях пишется PyTxId. Нужно игнорировать такие значения
             if entry.tx_id == chain.culprit_phy_tx_id:
-                logging.debug(f"{chain.victim_trace_id} - Value {entry.tx_id} is not a real TxId. Skipping")
+                if self._debug_enabled:
+                    logging.debug(f"{chain.victim_trace_id} - Value {entry.tx_id} is not a real TxId. Skipping")
                 return
             
             # Only log if we're actually setting a new value (chain.culprit_tx_id was empty)
@@ -316,108 +353,97 @@ class ChainTracerSinglePass:
     
     def _collect_session_tx(self, entry: LogEntry):
         """Запоминает, какая транзакция сейчас в сессии"""
-        if entry.session_id and entry.tx_id:
-            self._session_current_tx[entry.session_id] = entry.tx_id
-        elif entry.session_id and entry.begin_tx:
+        session_id = entry.session_id
+        if not session_id:
+            return
+        tx_id = entry.tx_id
+        if tx_id:
+            self._session_current_tx[session_id] = tx_id
+        elif entry.begin_tx:
             # Удаляю TxId т.к. этот запрос начал эту транзакцию
-            self._session_current_tx.pop(entry.session_id, None)
+            self._session_current_tx.pop(session_id, None)
 
     def _collect_transaction_queries(self, entry: LogEntry):
-        """Собирает запросы для транзакций."""
-        if entry.query_action:
-            if entry.tx_id and entry.tx_id != 'Empty':
-                self.queries_by_tx[entry.tx_id].append(entry)
-            elif entry.session_id:
-                # Если у запроса нет TxId то пытаемся найти текущую транзакцию для сессии
-                # Поскольку мы идем по логу в обратном порядке, мы это можем сделать
-                
-                inferred_tx = self._session_current_tx.get(entry.session_id)
-                if inferred_tx:
-                    self.queries_by_tx[inferred_tx].append(entry)
-                else:
-                    logging.debug(f"Query has no TxId and unable to infer TxId from SessionId {entry.session_id}")
+        """Собирает запросы для транзакций.
+
+        Вызывается только для записей с QueryAction, поэтому повторно это не проверяем.
+        """
+        tx_id = entry.tx_id
+        if tx_id and tx_id != 'Empty':
+            self.queries_by_tx[tx_id].append(entry)
+            return
+
+        session_id = entry.session_id
+        if session_id:
+            # Если у запроса нет TxId то пытаемся найти текущую транзакцию для сессии
+            # Поскольку мы идем по логу в обратном порядке, мы это можем сделать
+            inferred_tx = self._session_current_tx.get(session_id)
+            if inferred_tx:
+                self.queries_by_tx[inferred_tx].append(entry)
             else:
-                logging.debug(f"Query entry has QueryText and QueryAction but no TxId and no SessionId")
+                if self._debug_enabled:
+                    logging.debug(f"Query has no TxId and unable to infer TxId from SessionId {session_id}")
+        else:
+            if self._debug_enabled:
+                logging.debug("Query entry has QueryText and QueryAction but no TxId and no SessionId")
 
     
-    def _populate_queries(self):
-        """Заполняет victim_queries и culprit_queries для найденных цепочек."""
-        for chain in self.chains.values():
-            # Заполняем victim_queries
-            if chain.victim_tx_id:
-                chain.victim_queries = self._get_sorted_queries(chain.victim_tx_id)
-            
-            # Заполняем culprit_queries
-            if chain.culprit_tx_id:
-                chain.culprit_queries = self._get_sorted_queries(chain.culprit_tx_id)
+    def _populate_queries(self, chain: LockInvalidationChain):
+        """Заполняет victim_queries и culprit_queries для цепочки."""
+        # Заполняем victim_queries
+        if chain.victim_tx_id:
+            chain.victim_queries = self._get_sorted_queries(chain.victim_tx_id)
+        
+        # Заполняем culprit_queries
+        if chain.culprit_tx_id:
+            chain.culprit_queries = self._get_sorted_queries(chain.culprit_tx_id)
     
     def _get_sorted_queries(self, tx_id: str) -> List[LogEntry]:
         """Возвращает отсортированные по времени запросы для транзакции."""
-        queries = self.queries_by_tx.get(tx_id, [])
-        return sorted(queries, key=lambda x: x.timestamp or '')
+        sorted_queries = self._sorted_queries_by_tx.get(tx_id)
+        if sorted_queries is None:
+            queries = self.queries_by_tx.get(tx_id, [])
+            # Запросы собраны в обратном хронологическом порядке, а timsort сам
+            # находит такую убывающую последовательность и разворачивает ее.
+            # timestamp всегда строка (парсер подставляет "" если его нет), поэтому
+            # сортируем по attrgetter без лямбды
+            sorted_queries = sorted(queries, key=_timestamp_key)
+            self._sorted_queries_by_tx[tx_id] = sorted_queries
+        return sorted_queries
     
-    def _complete_remaining_chains(self):
-        """Завершает все цепочки, заполняя недостающую информацию."""
-        for chain in self.chains.values():
-            # Используем кэшированные данные для заполнения недостающих полей
-            culprit_entry = self.entries_by_trace.get(chain.culprit_trace_id)
-            victim_entry = self.entries_by_trace.get(chain.victim_trace_id)
-            
-            # Заполняем culprit_entry если не заполнено
-            if not chain.culprit_entry and culprit_entry:
-                chain.culprit_entry = culprit_entry
+    def _complete_chain(self, chain: LockInvalidationChain):
+        """Завершает цепочку, заполняя недостающую информацию."""
+        # Используем кэшированные данные для заполнения culprit_entry, если не заполнено
+        if not chain.culprit_entry:
+            chain.culprit_entry = self.entries_by_trace.get(chain.culprit_trace_id)
     
-    def _validate_chains(self):
-        """Проверяет, что все цепочки имеют все необходимые поля заполненными."""
-        incomplete_count = 0
+    def _validate_chain(self, chain: LockInvalidationChain) -> bool:
+        """Проверяет, что у цепочки заполнены все необходимые поля."""
+        # Все поля являются обязательными для полной цепочки
+        missing_fields = [field for field in _REQUIRED_CHAIN_FIELDS if not getattr(chain, field)]
         
-        for chain in self.chains.values():
-            missing_fields = []
-            
-            # Все поля являются обязательными для полной цепочки
-            if not chain.victim_session_id:
-                missing_fields.append("victim_session_id")
-            if not chain.victim_trace_id:
-                missing_fields.append("victim_trace_id")
-            if not chain.lock_id:
-                missing_fields.append("lock_id")
-            if not chain.culprit_phy_tx_id:
-                missing_fields.append("culprit_phy_tx_id")
-            if not chain.culprit_trace_id:
-                missing_fields.append("culprit_trace_id")
-            if not chain.culprit_session_id:
-                missing_fields.append("culprit_session_id")
-            if not chain.victim_entry:
-                missing_fields.append("victim_entry")
-            if not chain.culprit_entry:
-                missing_fields.append("culprit_entry")
-            if not chain.table_name:
-                missing_fields.append("table_name")
-            if not chain.victim_tx_id:
-                missing_fields.append("victim_tx_id")
-            if not chain.culprit_tx_id:
-                missing_fields.append("culprit_tx_id")
-            if not chain.victim_queries:
-                missing_fields.append("victim_queries")
-            if not chain.culprit_queries:
-                missing_fields.append("culprit_queries")
-            
-            # Логируем предупреждения для любых отсутствующих полей
-            if missing_fields:
-                incomplete_count += 1
+        # Логируем отсутствующие поля
+        if missing_fields:
+            if self._debug_enabled:
                 logging.debug(f"{chain.victim_trace_id} - Incomplete chain. Missing fields: {', '.join(missing_fields)}")
-
-        logging.info(f"Chain analysis complete: found {len(self.chains)} TLI chains, {incomplete_count} incomplete")
+            return False
+        return True
     
     def _extract_table_name(self, issues: Optional[str]) -> Optional[str]:
         """Извлекает имя таблицы из описания TLI."""
         if not issues:
             return None
         
-        # Ищет путь к таблице в сообщении о проблемах
-        table_match = re.search(r'Table:\s*`([^`]+)`', issues)
-        if table_match:
-            return table_match.group(1)
+        # Ищет путь к таблице в сообщении о проблемах: Table: `<path>`
+        # Формат фиксированный, поэтому обходимся str.find без регулярного выражения
+        start = issues.find('Table:')
+        while start >= 0:
+            rest = issues[start + 6:].lstrip()
+            if rest.startswith('`'):
+                end = rest.find('`', 1)
+                if end > 1:
+                    return rest[1:end]
+            start = issues.find('Table:', start + 6)
         
         return None
     
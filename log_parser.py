@@ -5,6 +5,7 @@
 """
 
 import re
+import sys
 import logging
 from typing import Dict, Optional, List, Iterator, TextIO
 from dataclasses import dataclass
@@ -12,7 +13,7 @@ from datetime import datetime
 from enum import StrEnum
 
 
-@dataclass
+@dataclass(slots=True)
 class LogEntry:
     """Разобранная на части строка лога"""
     timestamp: str
@@ -69,6 +70,14 @@ class LogParser:
         self.compiled_patterns = {
             key: re.compile(pattern) for key, pattern in self.patterns.items()
         }
+
+        # Префикс строки systemd и уровень логирования разбираются для каждой строки
+        self.systemd_prefix_pattern = re.compile(r'\w+\s+\d+\s+\d+:\d+:\d+\s+([^\s]+)\s+([^[]+)\[(\d+)\]:\s*(.+)')
+        self.level_pattern = re.compile(r':(\w+)\s+(\w+):')
+
+        # Идентификаторы повторяются во многих строках лога и служат ключами словарей
+        # в трассировщике. Интернируем их, чтобы хранить одну копию каждого значения
+        self.interned_fields = frozenset(('session_id', 'trace_id', 'phy_tx_id', 'tx_id'))
     
     def parse_line(self, line: str) -> Optional[LogEntry]:
         """Парсит одну строку лога"""
@@ -80,10 +89,7 @@ class LogParser:
             # Извлекаем обязательные поля, которые должны быть в любой строке
             # Формат: date time node process[pid]: timestamp :MESSAGE_TYPE LEVEL: ...
             # Дату, указанную в начале строки игнорируем - там нет миллисекунд
-            basic_match = re.match(
-                r'\w+\s+\d+\s+\d+:\d+:\d+\s+([^\s]+)\s+([^[]+)\[(\d+)\]:\s*(.+)',
-                line
-            )
+            basic_match = self.systemd_prefix_pattern.match(line)
             
             if not basic_match:
                 return None
@@ -94,7 +100,7 @@ class LogParser:
             # Строка начинается прямо с timestamp в UTC
             node, process, pid, content = None, None, None, line
         
-        level_match = re.search(r':(\w+)\s+(\w+):', content)
+        level_match = self.level_pattern.search(content)
         if not level_match:
             return None
             
@@ -115,7 +121,9 @@ class LogParser:
                 # Специальная обработка для множественных LockId
                 lock_ids = pattern.findall(content)
                 if lock_ids:
-                    setattr(entry, field, lock_ids)
+                    # LockId используются как ключи словарей в трассировщике,
+                    # интернирование делает сравнение ключей сравнением указателей
+                    setattr(entry, field, [sys.intern(lock_id) for lock_id in lock_ids])
             else:
                 match = pattern.search(content)
                 if match:
@@ -124,8 +132,10 @@ class LogParser:
                         entry.begin_tx = True
                     elif field == 'break_lock_id':
                         # Список сломанных блокировок
-                        lock_ids = [lock_id.strip() for lock_id in value.split()]
+                        lock_ids = [sys.intern(lock_id) for lock_id in value.split()]
                         setattr(entry, field, lock_ids)
+                    elif field in self.interned_fields:
+                        setattr(entry, field, sys.intern(value))
                     elif field == 'query_text':
                         unescaped_value = value.replace(r'\n','\n').replace(r'\"','"')
                         setattr(entry, field, unescaped_value)
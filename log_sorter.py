@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import os
 import subprocess
 import shutil
 import logging
@@ -24,7 +25,10 @@ def sort_log_stream(input_stream: TextIO, format: LogFormat = LogFormat.SYSTEMD)
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            encoding='utf-8'
+            encoding='utf-8',
+            # Временные метки в формате ISO-8601, поэтому побайтовое сравнение дает тот же
+            # порядок, что и сравнение с учетом локали, но работает намного быстрее
+            env={**os.environ, 'LC_ALL': 'C'}
         )
         
         try:
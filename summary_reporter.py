@@ -15,7 +15,8 @@ class SummaryReporter:
     """Generates aggregated summary reports from lock invalidation chains."""
     
     def __init__(self):
-        pass
+        # The same query text often shows up in many combinations
+        self._clean_query_cache: Dict[str, str] = {}
     
     def write_summary_report(self, chains: List[LockInvalidationChain], file: TextIO = sys.stdout, only_found: bool = False) -> None:
         """Writes aggregated summary report to the specified file.
@@ -37,14 +38,19 @@ class SummaryReporter:
             file.write("No transaction lock invalidation events with found culprits\n")
             return
         
+        # Summary lines are buffered here and flushed with one write() below
+        out: List[str] = []
+        
         # Write header
-        self._write_header(filtered_chains, file, only_found)
+        self._write_header(filtered_chains, out, only_found)
         
         # Aggregate combinations
         combinations = self._aggregate_combinations(filtered_chains, only_found)
         
         # Write aggregated results
-        self._write_aggregated_results(combinations, file)
+        self._write_aggregated_results(combinations, out)
+        
+        file.write("".join(out))
     
     def _filter_chains(self, chains: List[LockInvalidationChain], only_found: bool) -> List[LockInvalidationChain]:
         """Filters chains based on whether culprit has been found.
@@ -62,17 +68,17 @@ class SummaryReporter:
         # Filter chains that have both victim and culprit queries
         return [chain for chain in chains if chain.victim_queries and chain.culprit_queries]
     
-    def _write_header(self, chains: List[LockInvalidationChain], file: TextIO, only_found: bool = False) -> None:
+    def _write_header(self, chains: List[LockInvalidationChain], out: List[str], only_found: bool = False) -> None:
         """Writes report header with metadata."""
-        file.write("=" * 80 + "\n")
+        out.append("=" * 80 + "\n")
         if only_found:
-            file.write("YDB Transaction Lock Invalidation (TLI) Aggregated Summary - Culprits Found\n")
+            out.append("YDB Transaction Lock Invalidation (TLI) Aggregated Summary - Culprits Found\n")
         else:
-            file.write("YDB Transaction Lock Invalidation (TLI) Aggregated Summary\n")
-        file.write("=" * 80 + "\n")
-        file.write(f"Generated at: {datetime.now().isoformat()}\n")
-        file.write(f"Total invalidation events: {len(chains)}\n")
-        file.write("=" * 80 + "\n\n")
+            out.append("YDB Transaction Lock Invalidation (TLI) Aggregated Summary\n")
+        out.append("=" * 80 + "\n")
+        out.append(f"Generated at: {datetime.now().isoformat()}\n")
+        out.append(f"Total invalidation events: {len(chains)}\n")
+        out.append("=" * 80 + "\n\n")
     
     def _aggregate_combinations(self, chains: List[LockInvalidationChain], only_found: bool = False) -> Dict[Tuple[int, int], List[LockInvalidationChain]]:
         """Aggregates chains by victim+culprit hash combinations.
@@ -84,98 +90,111 @@ class SummaryReporter:
         
         combinations = defaultdict(list)
         
+        # A culprit that broke many victims has the same queries in all of its chains.
+        # Hash each query sequence once, keyed by the identities of its entries, instead
+        # of re-joining the query texts per chain. The entries stay referenced by the
+        # chains while this method runs, so their ids cannot be reused.
+        hashes_by_queries: Dict[Tuple[int, ...], int] = {}
+        
         for chain in chains:
+            victim_queries = chain.victim_queries
+            culprit_queries = chain.culprit_queries
+            
             # For only_found mode, skip chains without both victim and culprit queries
-            # For all events mode, we need to handle chains without culprits differently
-            if only_found:
-                if not chain.victim_queries or not chain.culprit_queries:
-                    continue
-                victim_hash = chain.get_victim_hash()
-                culprit_hash = chain.get_culprit_hash()
-                combination_key = (victim_hash, culprit_hash)
+            if only_found and (not victim_queries or not culprit_queries):
+                continue
+            
+            # For all events mode, use 0 instead of the hash if there are no queries
+            if victim_queries:
+                key = tuple(map(id, victim_queries))
+                victim_hash = hashes_by_queries.get(key)
+                if victim_hash is None:
+                    victim_hash = hashes_by_queries[key] = chain.get_victim_hash()
+            else:
+                victim_hash = 0
+            
+            if culprit_queries:
+                key = tuple(map(id, culprit_queries))
+                culprit_hash = hashes_by_queries.get(key)
+                if culprit_hash is None:
+                    culprit_hash = hashes_by_queries[key] = chain.get_culprit_hash()
             else:
-                # For all events, use victim hash and culprit hash (or 0 if no culprit)
-                victim_hash = chain.get_victim_hash() if chain.victim_queries else 0
-                culprit_hash = chain.get_culprit_hash() if chain.culprit_queries else 0
-                combination_key = (victim_hash, culprit_hash)
+                culprit_hash = 0
             
-            combinations[combination_key].append(chain)
+            combinations[(victim_hash, culprit_hash)].append(chain)
         
         return combinations
     
-    def _write_aggregated_results(self, combinations: Dict[Tuple[int, int], List[LockInvalidationChain]], file: TextIO) -> None:
+    def _write_aggregated_results(self, combinations: Dict[Tuple[int, int], List[LockInvalidationChain]], out: List[str]) -> None:
         """Writes the aggregated results sorted by count (descending)."""
         
         if not combinations:
-            file.write("No valid victim+culprit combinations found\n")
+            out.append("No valid victim+culprit combinations found\n")
             return
         
         # Sort by count (descending)
         sorted_combinations = sorted(combinations.items(), key=lambda x: len(x[1]), reverse=True)
         
-        file.write(f"Found {len(sorted_combinations)} unique victim+culprit combinations:\n\n")
+        out.append(f"Found {len(sorted_combinations)} unique victim+culprit combinations:\n\n")
         
         for i, ((victim_hash, culprit_hash), chain_list) in enumerate(sorted_combinations, 1):
             count = len(chain_list)
             representative_chain = chain_list[0]  # Use first chain as representative
             
-            file.write("-" * 80 + "\n")
-            file.write(f"#{i} TLI Count: {count}\n")
-            file.write("-" * 80 + "\n")
+            out.append("-" * 80 + "\n")
+            out.append(f"#{i} TLI Count: {count}\n")
+            out.append("-" * 80 + "\n")
             
             # Write victim information
-            file.write("VICTIM:\n")
+            out.append("VICTIM:\n")
             if representative_chain.victim_queries:
                 for j, query in enumerate(representative_chain.victim_queries, 1):
                     if query.query_text:
-                        # Clean and format query text, preserving full content
-                        query_text = query.query_text.strip()
-                        # Replace newlines and tabs with spaces for single-line display
-                        query_text = query_text.replace('\n', ' ').replace('\t', ' ')
-                        # Remove extra spaces
-                        query_text = ' '.join(query_text.split())
-                        file.write(f"  {j}. {query_text}\n")
+                        out.append(f"  {j}. {self._clean_query_text(query.query_text)}\n")
                     else:
-                        file.write(f"  {j}. {query.query_action}\n")
+                        out.append(f"  {j}. {query.query_action}\n")
             else:
-                file.write("  No victim queries available\n")
+                out.append("  No victim queries available\n")
             
-            file.write("\n")
+            out.append("\n")
             
             # Write culprit information
-            file.write("CULPRIT:\n")
+            out.append("CULPRIT:\n")
             if representative_chain.culprit_queries:
                 for j, query in enumerate(representative_chain.culprit_queries, 1):
                     if query.query_text:
-                        # Clean and format query text, preserving full content
-                        query_text = query.query_text.strip()
-                        # Replace newlines and tabs with spaces for single-line display
-                        query_text = query_text.replace('\n', ' ').replace('\t', ' ')
-                        # Remove extra spaces
-                        query_text = ' '.join(query_text.split())
-                        file.write(f"  {j}. {query_text}\n")
+                        out.append(f"  {j}. {self._clean_query_text(query.query_text)}\n")
                     else:
-                        file.write(f"  {j}. {query.query_action}\n")
+                        out.append(f"  {j}. {query.query_action}\n")
             else:
-                file.write("  CULPRIT NOT FOUND\n")
+                out.append("  CULPRIT NOT FOUND\n")
             
-            file.write("\n")
+            out.append("\n")
             
             # Write additional details
-            file.write("DETAILS:\n")
-            file.write(f"  Table: {representative_chain.table_name}\n")
+            out.append("DETAILS:\n")
+            out.append(f"  Table: {representative_chain.table_name}\n")
             if victim_hash != 0:
-                file.write(f"  Victim Hash: {victim_hash}\n")
+                out.append(f"  Victim Hash: {victim_hash}\n")
             if culprit_hash != 0:
-                file.write(f"  Culprit Hash: {culprit_hash}\n")
+                out.append(f"  Culprit Hash: {culprit_hash}\n")
             if victim_hash == culprit_hash and victim_hash != 0:
-                file.write(f"  Victim and cuplrit are different instances of the same transaction.\n")
+                out.append(f"  Victim and cuplrit are different instances of the same transaction.\n")
             
             # Show timestamps 
             timestamps = [chain.victim_entry.timestamp for chain in chain_list]
-            timestamps.sort()
-            file.write(f"  First occurrence: {timestamps[0]}\n")
-            file.write(f"  Last occurrence: {timestamps[-1]}\n")
+            out.append(f"  First occurrence: {min(timestamps)}\n")
+            out.append(f"  Last occurrence: {max(timestamps)}\n")
             
             
-            file.write("\n")
\ No newline at end of file
+            out.append("\n")
+
+    def _clean_query_text(self, query_text: str) -> str:
+        """Formats query text for single-line display, preserving full content."""
+        cleaned = self._clean_query_cache.get(query_text)
+        if cleaned is None:
+            # split() breaks on any whitespace run (newlines and tabs included) and
+            # drops leading/trailing whitespace, so a single join gives one-line text
+            cleaned = ' '.join(query_text.split())
+            self._clean_query_cache[query_text] = cleaned
+        return cleaned
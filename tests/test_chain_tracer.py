@@ -217,6 +217,39 @@ class TestChainTracer:
         assert chain.culprit_tx_id is None
         assert chain.victim_queries is None
         assert chain.culprit_queries is None
+
+    @pytest.mark.parametrize("query_actions,expected", [
+        (None, None),  # Queries not collected
+        ([], None),  # No queries found
+        (["QUERY_ACTION_EXECUTE", "QUERY_ACTION_COMMIT_TX"], True),
+        (["QUERY_ACTION_COMMIT_TX", "QUERY_ACTION_EXECUTE"], False),
+    ])
+    def test_is_victim_committed(self, query_actions, expected):
+        """Test is_victim_committed for missing, empty and filled victim queries."""
+        victim_queries = None
+        if query_actions is not None:
+            victim_queries = [
+                LogEntry(
+                    timestamp="2025-10-22T07:54:51.100000Z",
+                    node="test-node",
+                    process="test[123]",
+                    log_level="DEBUG",
+                    kikimr_service="QUERY",
+                    query_action=query_action
+                )
+                for query_action in query_actions
+            ]
+
+        chain = LockInvalidationChain(
+            victim_session_id="victim_session",
+            victim_trace_id="victim_trace",
+            victim_tx_id="victim_tx_id",
+            victim_entry=self.sample_entries[0],
+            table_name="test_table",
+            victim_queries=victim_queries
+        )
+
+        assert chain.is_victim_committed is expected
         
     def test_empty_log_entries(self):
         """Test tracer with empty log entries."""
@@ -628,7 +661,48 @@ class TestChainTracer:
         assert len(chains) == 1
         # Query should not be collected
         assert chains[0].victim_queries == []
-        
+
+    @pytest.mark.parametrize("query_timestamps", [
+        ["2025-10-22T07:54:51.200000Z", "2025-10-22T07:54:51.100000Z", "2025-10-22T07:54:51.000000Z"],  # Reverse log order
+        ["2025-10-22T07:54:51.100000Z", "2025-10-22T07:54:51.200000Z", "2025-10-22T07:54:51.000000Z"],  # Out of order
+    ])
+    def test_victim_queries_sorted_by_timestamp(self, query_timestamps):
+        """Test that victim queries are returned in chronological order."""
+        entries = [
+            LogEntry(
+                timestamp="2025-10-22T07:54:51.300000Z",
+                node="test-node",
+                process="test[123]",
+                log_level="ERROR",
+                kikimr_service="TLI",
+                session_id="victim_session",
+                trace_id="victim_trace",
+                tx_id="victim_tx",
+                status="ABORTED",
+                issues="Transaction locks invalidated. Table: `test_table`",
+                raw_line="test line"
+            )
+        ]
+        for timestamp in query_timestamps:
+            entries.append(LogEntry(
+                timestamp=timestamp,
+                node="test-node",
+                process="test[123]",
+                log_level="DEBUG",
+                kikimr_service="QUERY",
+                tx_id="victim_tx",
+                query_text=f"SELECT * FROM test_table -- {timestamp}",
+                query_action="QUERY_ACTION_EXECUTE",
+                trace_id="victim_trace",
+                raw_line="test line"
+            ))
+
+        tracer = ChainTracerSinglePass(entries)
+        chains = tracer.find_all_invalidation_chains()
+
+        assert len(chains) == 1
+        assert [q.timestamp for q in chains[0].victim_queries] == sorted(query_timestamps)
+
     def test_culprit_tx_id_same_as_phy_tx_id(self):
         """Test skipping tx_id when it matches phy_tx_id."""
         entries = [
@@ -722,4 +796,12 @@ class TestChainTracer:
         chains2 = tracer2.find_all_invalidation_chains(collect_details=False)
         
         assert len(chains2) == 1
-        assert chains2[0].log_details is None
\ No newline at end of file
+        assert chains2[0].log_details is None
+        
+    def test_collect_details_full_chain(self):
+        """Test that log_details contains every line that contributed to the chain."""
+        tracer = ChainTracerSinglePass(self.sample_entries)
+        chains = tracer.find_all_invalidation_chains(collect_details=True)
+
+        assert len(chains) == 1
+        assert list(chains[0].log_details) == ["test line 1", "test line 2", "test line 3", "test line 4"]
@@ -282,6 +282,16 @@ Invalid line 3"""
         assert entry.status is None
         assert entry.issues is None
         
+    def test_parse_line_empty_trace_id(self):
+        """Test that the 'Empty' TraceId placeholder is kept as the literal value."""
+        line = 'окт 22 10:54:51 ydb-static-node-3 ydbd[889]: 2025-10-22T07:54:51.428479Z :DATA_INTEGRITY INFO: Component: Executer,Type: Request,State: Execute,TraceId: Empty,PhyTxId: 844424930570463,Locks: [LockId: 844424930570463 DataShard: 72075186224047627 Generation: 1 Counter: 0 SchemeShard: 72075186224037897 PathId: 131 ]'
+        
+        entry = self.parser.parse_line(line)
+        
+        assert entry is not None
+        assert entry.trace_id == "Empty"
+        assert entry.phy_tx_id == "844424930570463"
+        
     def test_parse_line_malformed_timestamp(self):
         """Test parsing line with malformed timestamp."""
         line = "окт 22 10:54:51 ydb-static-node-3 ydbd[889]: INVALID_TIMESTAMP :DATA_INTEGRITY DEBUG: Component: SessionActor"
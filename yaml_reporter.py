@@ -8,7 +8,7 @@ import yaml
 import sys
 from typing import List, Dict, Any
 from datetime import datetime
-from chain_models import LockInvalidationChain
+from chain_models import LockInvalidationChain, victim_timestamp_key
 from datetime import datetime
 
 
@@ -43,7 +43,7 @@ class YAMLReporter:
             'lock_invalidation_events': []
         }
 
-        sorted_chains = sorted(chains, key=lambda x:datetime.fromisoformat(x.victim_entry.timestamp))
+        sorted_chains = sorted(chains, key=victim_timestamp_key)
         
         for i, chain in enumerate(sorted_chains, 1):
             event = self._format_chain_as_event(chain, i)